@@ -5,7 +5,9 @@ methods, classmethods, staticmethods or classes. See below for some notes
 about overloading classes, you strange person you.
 
 The appropriate implementation is chosen based on the calling argument
-pattern.
+pattern. Where more than one implementation accepts a call, the one with the
+most annotated parameters is chosen, then one without ``*args`` and then one
+without ``**keywords``, and otherwise the first added.
 
 For example:
 
@@ -97,8 +99,8 @@ _first_ of the overloaded functions' docstrings.
 either readability of the behaviour of this module's version of the decorator.
 `wrap_overloaded_as` returns the multiple-dispatcher function for the
 overloaded method of the same fully qualified name, and treats it as the
-"wrapper" for the decorated function (taking many of it's attributes,
-including name and docstring, as per `functools.wraps()`).
+"wrapper" for the decorated function (taking its module, name, qualified name,
+docstring and other attributes).
 
 NB: Please note that MyPy overloaded type checking is based on static analysis
 of the code, and requires `typing.overload` to be imported to accept `@overload`ed
@@ -140,6 +142,16 @@ classes.
 Version History (in Brief)
 --------------------------
 
+- 3.0.0 Much faster dispatch, by precomputing signatures and caching the
+        implementation chosen for each pattern of argument types.
+        Annotations are resolved on the first call rather than when
+        decorating, so they may name classes defined later.
+        Backwards-incompatible changes:
+        * Implementations are tried most specific first, rather than in the
+          order they were added, so a call may now reach a different one;
+        * The first implementation whose signature accepts the call is
+          always the one called: errors it raises are no longer caught to
+          try the next.
 - 2.0.0 Support interplay with typing.overload, for mypy type checking and IDE
         integration.
 - 1.4.2 Support complex type checking (e.g. Union types)
@@ -162,11 +174,11 @@ Version History (in Brief)
 
 See the end of the source file for the license of use.
 '''
-__version__ = '2.0.0'
+__version__ = '3.0.0'
 
-import functools
+import sys
 import types
-import unittest
+import weakref
 from typing import (
     get_args,
     get_type_hints,
@@ -174,7 +186,6 @@ from typing import (
     Callable,
     Dict,
     Iterable,
-    List,
     Optional,
     Sequence,
     Tuple,
@@ -189,19 +200,76 @@ class _Undefined:
         return False
 
 
-_ParamAnnotatedType = Union[type, Tuple[type, ...], _Undefined]
+# the default of a parameter without one
+_UNDEFINED = _Undefined()
+
+# None where the parameter isn't annotated, and so needn't be type-checked
+_ParamAnnotatedType = Optional[Union[type, Tuple[type, ...]]]
 _PositionalParamDefinition = Tuple[int, str, _ParamAnnotatedType, Any]
 _KeywordParamDefinition = Tuple[str, _ParamAnnotatedType, Any]
 
 
+def _is_plain_type(param_type: _ParamAnnotatedType) -> bool:
+    '''Whether isinstance() against the annotated type depends only on the class of the value.
+
+    That's so for ordinary classes, but not for those with a metaclass that overrides the check
+    (e.g. runtime-checkable protocols or ABCs with registered virtual subclasses).
+    '''
+    if param_type is None:
+        return True
+    if isinstance(param_type, tuple):
+        return all(type(member) is type for member in param_type)
+    return type(param_type) is type
+
+
+def _all_instances(values: Iterable, param_type: Union[type, Tuple[type, ...]]) -> bool:
+    if isinstance(param_type, tuple):
+        # no value's class is a tuple, so only isinstance can match a Union's types
+        for value in values:
+            if not isinstance(value, param_type):
+                return False
+        return True
+    for value in values:
+        # isinstance already matches an exact class quickly, but over many values skipping its
+        # call altogether for those adds up
+        if value.__class__ is param_type:
+            continue
+        if not isinstance(value, param_type):
+            return False
+    return True
+
+
 class _Signature:
     '''Wraps a callable to validate arguments against its signature.'''
-    undefined = _Undefined()
+    __slots__ = (
+        '_callable',
+        'implementation',
+        'fully_qualified_name',
+        '_skip_first_arg',
+        '_built',
+        '_has_varargs',
+        '_has_varkwargs',
+        '_varargs_type',
+        '_varkwargs_type',
+        '_type_hints',
+        '_positional_only_parameters_count',
+        '_positional_parameters',
+        '_positional_types',
+        '_keyword_only_parameters',
+        '_keyword_parameter_names',
+        '_required_count',
+        '_max_positional_count',
+        '_required_positional_count',
+        '_shape_only',
+        'plain_types',
+        '__weakref__',
+    )
 
     def __init__(self, f, /):
         self._callable = f
         self.implementation = f
-        self._skip_first_arg: bool = isinstance(f, classmethod)
+        # whether the first parameter is filled in by Python rather than the caller
+        self._skip_first_arg = isinstance(f, classmethod)
 
         # if the callable is a class then look for __new__ or __init__ variations
         if isinstance(f, type):
@@ -217,42 +285,143 @@ class _Signature:
             # actually call the method underlying the classmethod directly - the proxyish
             # object we've received as f has the class first param filled in...
             self._callable = self.implementation = f.__get__(f.__class__)
+        # the key overloads of the same callable are registered under, so interned
+        self.fully_qualified_name = sys.intern(
+            f"{self.implementation.__module__}.{self.implementation.__qualname__}"
+        )
+        self._built = False
+
+    def build(self) -> None:
+        '''Resolve everything validation needs, unless that's already been done.
+
+        The signature of a callable never changes, so this is done once rather than on every
+        call; and only when first needed, so annotations may name classes defined after the
+        callable.
+        '''
+        if self._built:
+            return
+        code = self._callable.__code__
+        self._has_varargs = bool(code.co_flags & 0x04)
+        self._has_varkwargs = bool(code.co_flags & 0x08)
+        # *args and **kwargs follow the keyword-only parameters, ahead of any local variables
+        variable_names = code.co_varnames[code.co_argcount + code.co_kwonlyargcount:]
+        self._type_hints = self._get_type_hints()
+        self._varargs_type = (
+            self._get_param_type(variable_names[0]) if self._has_varargs else None
+        )
+        self._varkwargs_type = (
+            self._get_param_type(variable_names[self._has_varargs]) if self._has_varkwargs else None
+        )
+        self._positional_only_parameters_count: int = code.co_posonlyargcount
+        self._positional_parameters = self._get_positional_parameters(self._skip_first_arg)
+        # the positional parameters' types on their own, to zip with the arguments filling them
+        self._positional_types = tuple(
+            param_type for _, _, param_type, _ in self._positional_parameters
+        )
+        self._keyword_only_parameters = self._get_keyword_only_parameters()
+        # the parameters a call may name (positional-only parameters can't be)
+        self._keyword_parameter_names = frozenset(
+            param
+            for index, param, _, _ in self._positional_parameters
+            if index >= self._positional_only_parameters_count
+        ).union(param for param, _, _ in self._keyword_only_parameters)
+        # the fewest arguments a call must provide positionally when it names none, and overall
+        self._required_positional_count = sum(
+            1 for _, _, _, default in self._positional_parameters if default is _UNDEFINED
+        )
+        self._required_count = self._required_positional_count + sum(
+            1 for _, _, default in self._keyword_only_parameters if default is _UNDEFINED
+        )
+        # the most arguments a call may pass positionally, or None if there's no limit
+        self._max_positional_count: Optional[int] = (
+            None if self._has_varargs else len(self._positional_parameters)
+        )
+        # whether validating a call without keyword arguments only needs to count its positional
+        # arguments, as none of the parameters they could fill are annotated
+        self._shape_only = self._varargs_type is None and all(
+            param_type is None for param_type in self._positional_types
+        )
+        # whether which calls are valid depends only on the classes of their arguments, so may be
+        # remembered by those classes
+        self.plain_types = all(
+            _is_plain_type(param_type)
+            for param_type in (
+                *self._positional_types,
+                *(param_type for _, param_type, _ in self._keyword_only_parameters),
+                self._varargs_type,
+                self._varkwargs_type,
+            )
+        )
+        self._built = True
+
+    def _get_type_hints(self) -> Dict[str, Any]:
+        # only the arguments of a call are checked: not its result, nor the first parameter when
+        # Python fills that in; so those annotations needn't even resolve
+        ignored = {'return'}
+        if self._skip_first_arg:
+            ignored.add(self._callable.__code__.co_varnames[0])
+        all_annotations = self._callable.__annotations__
+        annotations = {
+            param: annotation
+            for param, annotation in all_annotations.items()
+            if param not in ignored
+        }
+        if not annotations:
+            # no parameter is annotated, so there's nothing to resolve
+            return {}
+        # classes are their own type hints, so only resolve anything else (strings, forward
+        # references, generics...) through typing, as that's far slower
+        if all(isinstance(annotation, type) for annotation in annotations.values()) and not (
+            # typing makes these parameters Optional before Python 3.11
+            None in (self._callable.__defaults__ or ())
+            or None in (self._callable.__kwdefaults__ or {}).values()
+        ):
+            return annotations
+        if len(annotations) == len(all_annotations):
+            return get_type_hints(self._callable)
+        # typing resolves every annotation of a callable, so resolve those checked through a copy
+        # of it annotated with only those
+        checked = types.FunctionType(
+            self._callable.__code__,
+            self._callable.__globals__,
+            argdefs=self._callable.__defaults__,
+            closure=self._callable.__closure__,
+        )
+        checked.__kwdefaults__ = self._callable.__kwdefaults__
+        checked.__annotations__ = annotations
+        return get_type_hints(checked)
 
     def _get_param_type(self, param: str) -> _ParamAnnotatedType:
-        type_hints = get_type_hints(self._callable)
-        if param not in type_hints:
-            return self.undefined
-        type_hint = type_hints[param]
+        if param not in self._type_hints:
+            return None
+        type_hint = self._type_hints[param]
         # To support Union and other complex type structures
         type_arguments = get_args(type_hint)
         return type_arguments if type_arguments else type_hint
 
     def _get_positional_default(self, position: int) -> Any:
         if not self._callable.__defaults__:
-            return self.undefined
+            return _UNDEFINED
         default_count = len(self._callable.__defaults__)
         index = position - self._callable.__code__.co_argcount + default_count
         if 0 <= index < default_count:
             return self._callable.__defaults__[index]
         else:
-            return self.undefined
+            return _UNDEFINED
 
     def _get_keyword_default(self, parameter: str) -> Any:
-        keyword_only_defaults = getattr(self._callable, "__kwdefaults__", None) or {}
+        keyword_only_defaults = self._callable.__kwdefaults__ or {}
         if parameter in keyword_only_defaults:
             return keyword_only_defaults[parameter]
         else:
-            return self.undefined
+            return _UNDEFINED
 
-    @property
-    def _positional_only_parameters_count(self) -> int:
-        return getattr(self._callable.__code__, "co_posonlyargcount", None) or 0
-
-    @property
-    def _positional_parameters(self) -> Sequence[_PositionalParamDefinition]:
+    def _get_positional_parameters(
+        self, skip_first_arg: bool
+    ) -> Sequence[_PositionalParamDefinition]:
         # unlike instance methods, class methods don't appear to have the class passed in as the
         # first arg, so skip filling the first argument
-        start = 1 if self._skip_first_arg else 0
+        start = 1 if skip_first_arg else 0
         positional_parameters_slice = slice(start, self._callable.__code__.co_argcount)
         return tuple(
             (n, param, self._get_param_type(param), self._get_positional_default(n))
@@ -261,11 +430,8 @@ class _Signature:
             )
         )
 
-    @property
-    def _keyword_only_parameters(self) -> Sequence[_KeywordParamDefinition]:
-        keyword_only_parameter_count = (
-            getattr(self._callable.__code__, "co_kwonlyargcount", None) or 0
-        )
+    def _get_keyword_only_parameters(self) -> Sequence[_KeywordParamDefinition]:
+        keyword_only_parameter_count = self._callable.__code__.co_kwonlyargcount
         if not keyword_only_parameter_count:
             return ()
 
@@ -279,28 +445,111 @@ class _Signature:
         )
 
     @property
-    def fully_qualified_name(self):
-        return f"{self.implementation.__module__}.{self.implementation.__qualname__}"
+    def location(self) -> Tuple[str, int]:
+        '''Where the callable is defined, which stays the same when its module is reloaded.'''
+        code = self._callable.__code__
+        return code.co_filename, code.co_firstlineno
+
+    @property
+    def specificity(self) -> Tuple[int, bool, bool]:
+        '''Sorts the signatures most particular about the calls they accept first.'''
+        annotated_count = sum(
+            1 for param_type in self._positional_types if param_type is not None
+        ) + sum(1 for _, param_type, _ in self._keyword_only_parameters if param_type is not None)
+        return -annotated_count, self._has_varargs, self._has_varkwargs
+
+    def accepts_argument_counts(self, positional_count: int, keyword_count: int) -> bool:
+        '''Whether a call with so many positional and keyword arguments could be valid.'''
+        if self._max_positional_count is not None and positional_count > self._max_positional_count:
+            return False
+        if positional_count + keyword_count < self._required_count:
+            return False
+        return self._has_varkwargs or keyword_count <= len(self._keyword_parameter_names)
+
+    def positional_call_condition(self, name: str, namespace: Dict[str, Any]) -> Optional[str]:
+        '''Express validation of a call without keyword arguments as Python source.
+
+        The expression tests a tuple `args` of length `n`, and any types it refers to are added to
+        `namespace` under names prefixed with `name`. None means no such call can be valid.
+        '''
+        if self._required_count > self._required_positional_count:
+            # a keyword-only argument is required
+            return None
+        if self._varargs_type is not None:
+            # the types of any *args are left to validate()
+            namespace[name] = self
+            return f'{name}.validate(*args)'
+
+        required_count = self._required_positional_count
+        if self._max_positional_count is None:
+            conditions = [f'n >= {required_count}'] if required_count else []
+        elif self._max_positional_count == required_count:
+            conditions = [f'n == {required_count}']
+        else:
+            conditions = [f'{required_count} <= n <= {self._max_positional_count}']
+        for position, param_type in enumerate(self._positional_types):
+            if param_type is None:
+                continue
+            type_name = f'{name}_{position}'
+            namespace[type_name] = param_type
+            condition = f'isinstance(args[{position}], {type_name})'
+            if position >= required_count:
+                # the argument may be left to its default
+                condition = f'(n <= {position} or {condition})'
+            conditions.append(condition)
+        return ' and '.join(conditions) or 'True'
+
+    def validate(self, *args: Any, **kwargs: Any) -> bool:
+        arg_count = len(args)
+        # quickly reject calls with too many positional arguments
+        if self._max_positional_count is not None and arg_count > self._max_positional_count:
+            return False
+
+        if not kwargs:
+            # the arguments fill the positional parameters in order, leaving the rest defaulted
+            if (
+                arg_count < self._required_positional_count
+                or self._required_count > self._required_positional_count
+            ):
+                # No value for non-defaulted arg
+                return False
+            if self._shape_only:
+                # only the number of arguments matters to a signature without types
+                return True
+            for param_type, value in zip(self._positional_types, args):
+                if param_type is not None and not isinstance(value, param_type):
+                    # Arg is not of expected type
+                    return False
+            # any arguments left over are varargs, which the arity check has already allowed
+            return self._varargs_type is None or _all_instances(
+                args[len(self._positional_types):], self._varargs_type
+            )
 
-    def validate(self, *args, **kwargs) -> bool:
-        # duplicate the arguments provided so we may consume them
-        _args = list(args)
-        _kw = dict(kwargs)
+        # quickly reject calls with too few arguments overall
+        if arg_count + len(kwargs) < self._required_count:
+            return False
+        if not self._has_varkwargs and not kwargs.keys() <= self._keyword_parameter_names:
+            # Varkwargs where none expected, or positional-only arg specified in kwargs
+            return False
+
+        # walk the arguments provided rather than copying them, so rejecting a call costs nothing
+        next_arg = 0
 
         # validate args (and kwargs, where specified for positional parameters
         for index, param, param_type, default in self._positional_parameters:
-            if _args:
-                if param in _kw:
+            if next_arg < arg_count:
+                if param in kwargs:
                     # Arg specified in both args and kwargs
                     return False
-                value = _args.pop(0)
-            elif param in _kw:
+                value = args[next_arg]
+                next_arg += 1
+            elif param in kwargs:
                 # Arg provided as kwarg
                 if index < self._positional_only_parameters_count:
                     # Positional-only arg specified in kwargs
                     return False
-                value = _kw.pop(param)
-            elif default is self.undefined:
+                value = kwargs[param]
+            elif default is _UNDEFINED:
                 # No value for non-defaulted arg
                 return False
             else:
@@ -308,695 +557,288 @@ class _Signature:
                 # Default should not be type-checked
                 continue
 
-            if not (isinstance(param_type, _Undefined) or isinstance(value, param_type)):
+            if param_type is not None and not isinstance(value, param_type):
                 # Arg is not of expected type
                 return False
 
         # validate remaining kwargs against keyword-only arguments
         for param, param_type, default in self._keyword_only_parameters:
-            if param in _kw:
-                value = _kw.pop(param)
-                if not (isinstance(param_type, _Undefined) or isinstance(value, param_type)):
+            if param in kwargs:
+                value = kwargs[param]
+                if param_type is not None and not isinstance(value, param_type):
                     # Keyword-only arg is not of expected type
                     return False
-            elif default is self.undefined:
+            elif default is _UNDEFINED:
                 # No value for non-defaulted keyword-only arg
                 return False
 
         # validate remaining varargs/-kwargs
-        vararg_index = -1
-        to_verify: List[Tuple[str, Iterable]] = []
-        if self._callable.__code__.co_flags & 0x08:
-            to_verify.append((self._callable.__code__.co_varnames[vararg_index], kwargs.values()))
-            vararg_index = -2
-        elif _kw:
-            # Varkwargs where none expected
-            return False
-        if self._callable.__code__.co_flags & 0x04:
-            to_verify.append((self._callable.__code__.co_varnames[vararg_index], args))
-        elif _args:
-            # Varargs where none expected
+        if self._varkwargs_type is not None and not _all_instances(
+            (
+                value
+                for param, value in kwargs.items()
+                if param not in self._keyword_parameter_names
+            ),
+            self._varkwargs_type,
+        ):
+            # Varkwargs of unexpected types are present
             return False
-        for vararg_name, values in to_verify:
-            param_type = self._get_param_type(vararg_name)
-            if not (
-                isinstance(param_type, _Undefined) or all(isinstance(v, param_type) for v in values)
-            ):
-                # Varargs/-kwargs of unexpected types are present
-                return False
+        # any arguments left over are varargs, which the arity check has already allowed
+        return self._varargs_type is None or _all_instances(args[next_arg:], self._varargs_type)
+
+
+def _compile_positional_dispatch(definitions: Sequence[_Signature]) -> Callable:
+    '''Generate the multiple-dispatch for calls without keyword arguments.
+
+    Every definition's arity and type checks are inlined into a cascade of if statements, tried in
+    the order given: most specific first, once `overload()` has sorted them.
+    '''
+    namespace: Dict[str, Any] = {}
+    source = ['def positional_dispatch(*args):', '    n = len(args)']
+    for index, definition in enumerate(definitions):
+        condition = definition.positional_call_condition(f'_d{index}', namespace)
+        if condition is None:
+            continue
+        namespace[f'_i{index}'] = definition.implementation
+        source += [
+            f'    if {condition}:',
+            f'        return _i{index}(*args)',
+        ]
+    source.append("    raise TypeError('invalid call argument(s)')")
+    exec(compile('\n'.join(source), '<overload>', 'exec'), namespace)
+    return namespace['positional_dispatch']
+
+
+# signatures already built, so a callable overloaded more than once is only introspected once;
+# keyed by the kind of callable and the identity of the function it wraps, which the signature
+# keeps alive for as long as it's in use
+_signature_cache: 'weakref.WeakValueDictionary[Tuple[type, int], _Signature]' = (
+    weakref.WeakValueDictionary()
+)
+
+
+def _get_signature(f: Any) -> _Signature:
+    if isinstance(f, (classmethod, staticmethod)):
+        key = (type(f), id(f.__func__))
+    else:
+        key = (type(f), id(f))
+    signature = _signature_cache.get(key)
+    if signature is None:
+        signature = _signature_cache[key] = _Signature(f)
+    return signature
+
+
+# the most dispatch decisions remembered for each overloaded callable; calls of more distinct
+# shapes (e.g. with dynamically created types) make it forget the oldest
+_DISPATCH_CACHE_SIZE = 256
+
+
+def _remember(cache: Dict[Any, Any], key: Any, value: Any) -> Any:
+    if len(cache) >= _DISPATCH_CACHE_SIZE:
+        # dicts keep insertion order, so the first key is the oldest
+        del cache[next(iter(cache))]
+    cache[key] = value
+    return value
 
-        return True
 
+# the number of definitions from which single-argument calls are dispatched by a table lookup on
+# the argument's type, rather than by the generated if-cascade; below this the cascade is as quick
+_SINGLE_ARGUMENT_DISPATCH_THRESHOLD = 2
 
-_overload_register: Dict[str, Tuple[Callable, List[_Signature]]] = {}
 
+def _wraps(multiple_dispatch: Callable, wrapped: Any) -> Callable:
+    '''Document the multiple-dispatch as the callable it wraps.
 
-def overload(original_callable):
+    Unlike `functools.wraps()` this doesn't set `__wrapped__`, so `inspect.signature()` reports the
+    dispatcher's own signature rather than that of whichever overload happened to be wrapped.
+    '''
+    multiple_dispatch.__module__ = getattr(wrapped, '__module__', multiple_dispatch.__module__)
+    multiple_dispatch.__name__ = getattr(wrapped, '__name__', 'overloaded')
+    multiple_dispatch.__qualname__ = getattr(wrapped, '__qualname__', multiple_dispatch.__name__)
+    multiple_dispatch.__doc__ = getattr(wrapped, '__doc__', None)
+    # e.g. attributes set by other decorators, or an overloaded class's attributes and methods
+    multiple_dispatch.__dict__.update(
+        (name, value)
+        for name, value in getattr(wrapped, '__dict__', {}).items()
+        if name != '__wrapped__'
+    )
+    return multiple_dispatch
+
+
+# the multiple-dispatch of each overloaded callable, by fully qualified name, until nothing else
+# refers to it; so a redefinition after the old one is dropped doesn't add to it
+_overload_register: 'weakref.WeakValueDictionary[str, Callable]' = weakref.WeakValueDictionary()
+
+# the multiple-dispatch each overloaded definition was last registered with, by where it's defined;
+# a definition already part of the registered multiple-dispatch is being run again (e.g. by
+# importlib.reload() while the old module's globals still refer to the old one), so starts afresh
+_overload_locations: 'weakref.WeakValueDictionary[Tuple[str, int], Callable]' = (
+    weakref.WeakValueDictionary()
+)
+
+
+def overload(original_callable: Any) -> Any:
     '''Allow overloading of a callable.
 
     Invoke the result of this call with .add() to add additional
     implementations.
     '''
-    definition = _Signature(original_callable)
-
-    definitions: List[_Signature]
-    multiple_dispatch = Callable
+    definition = _get_signature(original_callable)
 
     overload_key = definition.fully_qualified_name
-    if overload_key in _overload_register:
-        multiple_dispatch, definitions = _overload_register[overload_key]
-        definitions.append(definition)
-    else:
-        definitions = [definition]
-
-        def multiple_dispatch(*args, **kwargs):
+    location = definition.location
+    registered_dispatch = _overload_register.get(overload_key)
+    if (
+        registered_dispatch is not None
+        and _overload_locations.get(location) is not registered_dispatch
+    ):
+        _overload_locations[location] = registered_dispatch
+        return registered_dispatch.add(definition=definition)  # type: ignore[attr-defined]
+
+    definitions = [definition]
+    # which definition accepts a call with keyword arguments depends only on the types of its
+    # arguments and the keywords' names, so remember it (or None) for each distinct shape of call
+    dispatch_cache: Dict[Tuple, Optional[Callable]] = {}
+    # the definitions that could accept each number of positional and keyword arguments seen,
+    # so a cache miss need only validate those
+    arity_buckets: Dict[Tuple[int, int], Tuple[_Signature, ...]] = {}
+    # the implementation accepting a single positional argument, by the type of that argument;
+    # only worth a lookup once there's more than one definition to choose between
+    single_argument_dispatch: Dict[type, Optional[Callable]] = {}
+    use_single_argument_dispatch = False
+    # definitions are only introspected and put in order once a call needs them, and again
+    # after another is added
+    ordered_definitions: Tuple[_Signature, ...] = ()
+    prepared = False
+
+    def prepare() -> None:
+        nonlocal ordered_definitions, prepared, use_single_argument_dispatch
+        if not prepared:
             for definition in definitions:
-                if definition.validate(*args, **kwargs):
-                    # attempt to invoke the callable
-                    try:
-                        return definition.implementation(*args, **kwargs)
-                    except (TypeError, ValueError) as e:
-                        continue
+                definition.build()
+            # sorted into a new tuple rather than in place, as other threads calling meanwhile
+            # would see a list being sorted as empty; and stable, so definitions equally specific
+            # stay in the order they were added
+            ordered_definitions = tuple(
+                sorted(definitions, key=lambda definition: definition.specificity)
+            )
+            # the table can only hold one answer per type of argument
+            use_single_argument_dispatch = use_single_argument_dispatch and all(
+                definition.plain_types for definition in ordered_definitions
+            )
+            # only once the order is in place, so no call dispatches on it before then
+            prepared = True
+
+    def keyword_dispatch(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Callable]:
+        # one flat tuple is cheapest to build and hash, and unambiguous: the argument types are
+        # followed by the keywords' names, which are strings rather than types, then their types
+        key = (*map(type, args), *kwargs, *map(type, kwargs.values()))
+        try:
+            return dispatch_cache[key]
+        except KeyError:
+            prepare()
+            arity = (len(args), len(kwargs))
+            candidates = arity_buckets.get(arity)
+            if candidates is None:
+                candidates = arity_buckets[arity] = tuple(
+                    definition
+                    for definition in ordered_definitions
+                    if definition.accepts_argument_counts(*arity)
+                )
+            implementation = next(
+                (
+                    definition.implementation
+                    for definition in candidates
+                    if definition.validate(*args, **kwargs)
+                ),
+                None,
+            )
+            # the answer can only be remembered by the types of the arguments if that's all it
+            # depends on: not so for a proxy, which claims another __class__ that isinstance()
+            # checks as well
+            if all(definition.plain_types for definition in candidates) and all(
+                type(arg) is arg.__class__ for arg in (*args, *kwargs.values())
+            ):
+                _remember(dispatch_cache, key, implementation)
+            return implementation
+
+    positional_dispatch: Callable[..., Any]
+
+    def compile_positional_dispatch(*args: Any) -> Any:
+        nonlocal positional_dispatch
+        prepare()
+        positional_dispatch = _compile_positional_dispatch(ordered_definitions)
+        return positional_dispatch(*args)
+
+    # generated when first needed after each change to the definitions
+    positional_dispatch = compile_positional_dispatch
+
+    def multiple_dispatch(*args: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            implementation = keyword_dispatch(args, kwargs)
+        elif len(args) == 1 and use_single_argument_dispatch:
+            try:
+                implementation = single_argument_dispatch[type(args[0])]
+            except KeyError:
+                prepare()
+                # a proxy claims another __class__, which isinstance() checks as well as its type,
+                # so the same type may need a different answer next time
+                if not use_single_argument_dispatch or type(args[0]) is not args[0].__class__:
+                    return positional_dispatch(*args)
+                implementation = _remember(single_argument_dispatch, type(args[0]), next(
+                    (
+                        definition.implementation
+                        for definition in ordered_definitions
+                        if definition.validate(*args)
+                    ),
+                    None,
+                ))
+        else:
+            return positional_dispatch(*args)
 
+        if implementation is None:
             # this error message probably can't get any better :-)
             raise TypeError('invalid call argument(s)')
+        return implementation(*args, **kwargs)
+
+    def add(other_callable: Any = None, *, definition: Optional[_Signature] = None) -> Any:
+        nonlocal positional_dispatch, use_single_argument_dispatch, prepared
+        if other_callable:
+            definitions.append(_get_signature(other_callable))
+        elif definition:
+            definitions.append(definition)
+        else:
+            raise TypeError(
+                "Expected either callable positional argument or 'definition' keyword argument"
+            )
+        prepared = False
+        dispatch_cache.clear()
+        arity_buckets.clear()
+        single_argument_dispatch.clear()
+        use_single_argument_dispatch = len(definitions) >= _SINGLE_ARGUMENT_DISPATCH_THRESHOLD
+        positional_dispatch = compile_positional_dispatch
+        # already documented as the original callable when created
+        return dispatch_reference()
 
-        def add(other_callable=None, *, definition: Optional[_Signature] = None):
-            if other_callable:
-                definitions.append(_Signature(other_callable))
-            elif definition:
-                definitions.append(definition)
-            else:
-                raise TypeError(
-                    "Expected either callable positional argument or 'definition' keyword argument"
-                )
-            return functools.wraps(original_callable)(multiple_dispatch)
-
-        multiple_dispatch.add = add
+    # add() is an attribute of the multiple-dispatch, so only refers back to it weakly; otherwise
+    # the cycle would keep it registered until the garbage collector next ran
+    dispatch_reference = weakref.ref(multiple_dispatch)
+    multiple_dispatch.add = add  # type: ignore[attr-defined]
 
-        _overload_register[overload_key] = multiple_dispatch, definitions
+    _overload_register[overload_key] = multiple_dispatch
+    _overload_locations[location] = multiple_dispatch
 
-    return functools.wraps(original_callable)(multiple_dispatch)
+    return _wraps(multiple_dispatch, original_callable)
 
 
-def wrap_overloaded_as(callable):
-    definition = _Signature(callable)
+def wrap_overloaded_as(callable: Any) -> Any:
+    definition = _get_signature(callable)
     overload_key = definition.fully_qualified_name
     try:
-        multiple_dispatch, _ = _overload_register[overload_key]
+        multiple_dispatch = _overload_register[overload_key]
     except KeyError:
         raise TypeError("Can only wrap a previously-overloaded function/method")
-    return functools.wraps(callable)(multiple_dispatch)
-
-
-class TestOverload(unittest.TestCase):
-    def test_wrapping(self):
-        'check that we generate a nicely-wrapped result'
-        @overload
-        def func(arg):
-            'doc'
-            pass
-        @func.add
-        def func(*args):
-            'doc2'
-            pass
-        self.assertEqual(func.__doc__, 'doc')
-
-    def test_method(self):
-        'check we can overload instance methods'
-        class A:
-            @overload
-            def method(self):
-                return 'ok'
-            @method.add
-            def method(self, *args):
-                return 'args'
-        self.assertEqual(A().method(), 'ok')
-        self.assertEqual(A().method(1), 'args')
-
-    def test_classmethod(self):
-        'check we can overload classmethods'
-        class A:
-            @overload
-            @classmethod
-            def method(cls):
-                return 'ok'
-            @method.add
-            @classmethod
-            def method(cls, *args):
-                return 'args'
-        self.assertEqual(A.method(), 'ok')
-        self.assertEqual(A.method(1), 'args')
-
-    def test_staticmethod(self):
-        'check we can overload staticmethods'
-        class A:
-            @overload
-            @staticmethod
-            def method():
-                return 'ok'
-            @method.add
-            @staticmethod
-            def method(*args):
-                return 'args'
-        self.assertEqual(A.method(), 'ok')
-        self.assertEqual(A.method(1), 'args')
-
-    def test_class(self):
-        @overload
-        class A(object):
-            first = True
-            def __new__(cls):
-                # must explicitly reference the base class
-                return object.__new__(cls)
-
-        @A.add
-        class A(object):
-            first = False
-            def __new__(cls, a):
-                # must explicitly reference the base class
-                return object.__new__(cls)
-        self.assertEqual(A().first, True)
-        self.assertEqual(A(1).first, False)
-
-    def test_arg_pattern(self):
-        @overload
-        def func(a):
-            return 'with a'
-
-        @func.add
-        def func(a, b):
-            return 'with a and b'
-
-        self.assertEqual(func('a'), 'with a')
-        self.assertEqual(func('a', 'b'), 'with a and b')
-        self.assertRaises(TypeError, func)
-        self.assertRaises(TypeError, func, 'a', 'b', 'c')
-        self.assertRaises(TypeError, func, b=1)
-
-    def test_positional_only_args(self):
-        @overload
-        def func(a, /, b):
-            return 'with b and positional-only a'
-
-        @func.add
-        def func(a, b):
-            return 'with a and b'
-
-        self.assertEqual(func('a', b='b'), 'with b and positional-only a')
-        self.assertEqual(func(a='a', b='b'), 'with a and b')
-
-    def test_overload_independent(self):
-        class A(object):
-            @overload
-            def method(self):
-                return 'a'
-
-        class B(object):
-            @overload
-            def method(self):
-                return 'b'
-
-        self.assertEqual(A().method(), 'a')
-        self.assertEqual(B().method(), 'b')
-
-    def test_arg_types(self):
-        @overload
-        def func(a:int):
-            return 'int'
-
-        @func.add
-        def func(a:str):
-            return 'str'
-
-        @func.add
-        def func(a:Union[dict, list]):
-            return 'dict or list'
-
-        self.assertEqual(func(1), 'int')
-        self.assertEqual(func('1'), 'str')
-        self.assertEqual(func({}), 'dict or list')
-        self.assertRaises(TypeError, func, ())
-
-    def test_varargs(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(*args):
-            return '*args {}'.format(len(args))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(1, 2), '*args 2')
-
-    def test_varargs_types(self):
-        @overload
-        def func(*args: int):
-            return 'int'
-
-        @func.add
-        def func(*args: str):
-            return 'str'
-
-        @func.add
-        def func(*args):
-            return 'any'
-
-        self.assertEqual(func(1), 'int')
-        self.assertEqual(func('1', '2'), 'str')
-        self.assertEqual(func(1, '2'), 'any')
-
-    def test_varargs_mixed(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(a, *args):
-            return '*args {}'.format(len(args))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(1, 2), '*args 1')
-        self.assertEqual(func(1, 2, 3), '*args 2')
-
-    def test_kw(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(**kw):
-            return '**kw {}'.format(len(kw))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=1, b=2), '**kw 2')
-
-    def test_kw_only_args(self):
-        @overload
-        def func(a, *, b):
-            return 'with a and keyword only b'
-
-        @func.add
-        def func(a, b):
-            return 'with a and b'
-
-        self.assertEqual(func(1, 2), 'with a and b')
-        self.assertEqual(func(a=1, b=2), 'with a and keyword only b')
-
-    def test_kw_types(self):
-        @overload
-        def func(**kw: int):
-            return 'int'
-
-        @func.add
-        def func(**kw: str):
-            return 'str'
-
-        @func.add
-        def func(**kw):
-            return 'any'
-
-        self.assertEqual(func(a=1), 'int')
-        self.assertEqual(func(b='1', a='2'), 'str')
-        self.assertEqual(func(b=1, a='2'), 'any')
-
-    def test_kw_mixed(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(a, **kw):
-            return '**kw {}'.format(len(kw))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=1, b=2), '**kw 1')
-
-    def test_kw_mixed2(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(c=1, **kw):
-            return '**kw {}'.format(len(kw))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(c=1, a=2), '**kw 1')
-
-    def test_kw_mixed3(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @func.add
-        def func(a=1, b=2, c=3, **kw):
-            return 'a {a}, b {b}, c {c}, **kw {count}'.format(a=a, b=b, c=c, count=len(kw))
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=4, c=5, d=0), 'a 4, b 2, c 5, **kw 1')
-
-
-class TestOverloadMyPyIntegration(unittest.TestCase):
-    def test_wrapping(self):
-        'check that we generate a nicely-wrapped result'
-        @overload
-        def func(arg):
-            'doc'
-            pass
-        @overload
-        def func(*args):
-            'doc2'
-            pass
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc3'
-        self.assertEqual(func.__doc__, 'doc3')
-
-    def test_method(self):
-        'check we can overload instance methods'
-        class A:
-            @overload
-            def method(self):
-                return 'ok'
-            @overload
-            def method(self, *args):
-                return 'args'
-            @wrap_overloaded_as
-            def method(self, *args, **kwargs):
-                'doc'
-        self.assertEqual(A().method(), 'ok')
-        self.assertEqual(A().method(1), 'args')
-
-    def test_classmethod(self):
-        'check we can overload classmethods'
-        class A:
-            @overload
-            @classmethod
-            def method(cls):
-                return 'ok'
-            @overload
-            @classmethod
-            def method(cls, *args):
-                return 'args'
-            @wrap_overloaded_as
-            @classmethod
-            def method(cls, *args, **kwargs):
-                'doc'
-        self.assertEqual(A.method(), 'ok')
-        self.assertEqual(A.method(1), 'args')
-
-    def test_staticmethod(self):
-        'check we can overload staticmethods'
-        class A:
-            @overload
-            @staticmethod
-            def method():
-                return 'ok'
-            @method.add
-            @staticmethod
-            def method(*args):
-                return 'args'
-            @wrap_overloaded_as
-            @staticmethod
-            def method(cls, *args, **kwargs):
-                'doc'
-        self.assertEqual(A.method(), 'ok')
-        self.assertEqual(A.method(1), 'args')
-
-    def test_class(self):
-        @overload
-        class A(object):
-            first = True
-            def __new__(cls):
-                # must explicitly reference the base class
-                return object.__new__(cls)
-
-        @overload
-        class A(object):
-            first = False
-            def __new__(cls, a):
-                # must explicitly reference the base class
-                return object.__new__(cls)
-
-        @wrap_overloaded_as
-        class A(object):
-            'doc'
-            def __new__(cls):
-                pass
-
-        self.assertEqual(A().first, True)
-        self.assertEqual(A(1).first, False)
-
-    def test_arg_pattern(self):
-        @overload
-        def func(a):
-            return 'with a'
-
-        @overload
-        def func(a, b):
-            return 'with a and b'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func('a'), 'with a')
-        self.assertEqual(func('a', 'b'), 'with a and b')
-        self.assertRaises(TypeError, func)
-        self.assertRaises(TypeError, func, 'a', 'b', 'c')
-        self.assertRaises(TypeError, func, b=1)
-
-    def test_positional_only_args(self):
-        @overload
-        def func(a, /, b):
-            return 'with b and positional-only a'
-
-        @overload
-        def func(a, b):
-            return 'with a and b'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func('a', b='b'), 'with b and positional-only a')
-        self.assertEqual(func(a='a', b='b'), 'with a and b')
-
-    def test_overload_independent(self):
-        class A(object):
-            @overload
-            def method(self):
-                return 'a'
-            @overload
-            def method(self, a):
-                return 'a2'
-            @wrap_overloaded_as
-            def method(self, *args, **kwargs):
-                'doc A'
-
-        class B(object):
-            @overload
-            def method(self):
-                return 'b'
-            @overload
-            def method(self, b):
-                return 'b2'
-            @wrap_overloaded_as
-            def method(self, *args, **kwargs):
-                'doc B'
-
-        self.assertEqual(A().method(), 'a')
-        self.assertEqual(B().method(), 'b')
-
-    def test_arg_types(self):
-        @overload
-        def func(a:int):
-            return 'int'
-
-        @overload
-        def func(a:str):
-            return 'str'
-
-        @overload
-        def func(a:Union[dict, list]):
-            return 'dict or list'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'int')
-        self.assertEqual(func('1'), 'str')
-        self.assertEqual(func({}), 'dict or list')
-        self.assertRaises(TypeError, func, ())
-
-    def test_varargs(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(*args):
-            return '*args {}'.format(len(args))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(1, 2), '*args 2')
-
-    def test_varargs_types(self):
-        @overload
-        def func(*args: int):
-            return 'int'
-
-        @overload
-        def func(*args: str):
-            return 'str'
-
-        @overload
-        def func(*args):
-            return 'any'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'int')
-        self.assertEqual(func('1', '2'), 'str')
-        self.assertEqual(func(1, '2'), 'any')
-
-    def test_varargs_mixed(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(a, *args):
-            return '*args {}'.format(len(args))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(1, 2), '*args 1')
-        self.assertEqual(func(1, 2, 3), '*args 2')
-
-    def test_kw(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(**kw):
-            return '**kw {}'.format(len(kw))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=1, b=2), '**kw 2')
-
-    def test_kw_only_args(self):
-        @overload
-        def func(a, *, b):
-            return 'with a and keyword only b'
-
-        @overload
-        def func(a, b):
-            return 'with a and b'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1, 2), 'with a and b')
-        self.assertEqual(func(a=1, b=2), 'with a and keyword only b')
-
-    def test_kw_types(self):
-        @overload
-        def func(**kw: int):
-            return 'int'
-
-        @overload
-        def func(**kw: str):
-            return 'str'
-
-        @overload
-        def func(**kw):
-            return 'any'
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(a=1), 'int')
-        self.assertEqual(func(b='1', a='2'), 'str')
-        self.assertEqual(func(b=1, a='2'), 'any')
-
-    def test_kw_mixed(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(a, **kw):
-            return '**kw {}'.format(len(kw))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=1, b=2), '**kw 1')
-
-    def test_kw_mixed2(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(c=1, **kw):
-            return '**kw {}'.format(len(kw))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(c=1, a=2), '**kw 1')
-
-    def test_kw_mixed3(self):
-        @overload
-        def func(a):
-            return 'a'
-
-        @overload
-        def func(a=1, b=2, c=3, **kw):
-            return 'a {a}, b {b}, c {c}, **kw {count}'.format(a=a, b=b, c=c, count=len(kw))
-
-        @wrap_overloaded_as
-        def func(*args, **kwargs):
-            'doc'
-
-        self.assertEqual(func(1), 'a')
-        self.assertEqual(func(a=1), 'a')
-        self.assertEqual(func(a=4, c=5, d=0), 'a 4, b 2, c 5, **kw 1')
-
-if __name__ == '__main__':
-    unittest.main()
+    return _wraps(multiple_dispatch, callable)
 
 
 # Copyright (c) 2011 Richard Jones <richard@mechanicalcat.net>
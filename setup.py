@@ -1,28 +1,23 @@
 #! /usr/bin/env python
 
-from distutils.core import setup
+import ast
+import os
+import re
 
-from overload import __version__, __doc__
+from setuptools import setup
 
-# perform the setup action
+# read the version and documentation from the module's source rather than importing it, which
+# would run the whole module (and needs it on the path, which PEP 517 builds don't arrange)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'overload.py')) as f:
+    source = f.read()
+__version__ = re.search(r"^__version__ = '([^']+)'", source, re.MULTILINE).group(1)
+__doc__ = ast.get_docstring(ast.parse(source), clean=False)
+
+# the remaining metadata is declared in pyproject.toml
 setup(
-    name = "overload",
     version = __version__,
-    description = "simple provision of method overloading",
     long_description = __doc__,
-    author = "Richard Jones",
-    author_email = "richard@python.org",
-    py_modules = ['overload'],
-    url = 'http://pypi.python.org/pypi/overload',
-    classifiers = [
-        'Environment :: Web Environment',
-        'Intended Audience :: Developers',
-        'Programming Language :: Python :: 3',
-        'Topic :: Software Development :: Code Generators',
-        'Topic :: Software Development :: Libraries :: Python Modules',
-        'Topic :: Text Processing :: Markup :: HTML',
-        'License :: OSI Approved :: BSD License',
-    ],
+    long_description_content_type = 'text/plain',
 )
 
 # vim: set filetype=python ts=4 sw=4 et si
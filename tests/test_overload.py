@@ -0,0 +1,1023 @@
+import abc
+import gc
+import importlib
+import os
+import sys
+import tempfile
+import textwrap
+import threading
+import unittest
+import weakref
+from typing import Protocol, Union, runtime_checkable
+
+from overload import _DISPATCH_CACHE_SIZE, overload, wrap_overloaded_as
+
+
+class TestOverload(unittest.TestCase):
+    def test_wrapping(self):
+        'check that we generate a nicely-wrapped result'
+        @overload
+        def func(arg):
+            'doc'
+            pass
+        @func.add
+        def func(*args):
+            'doc2'
+            pass
+        self.assertEqual(func.__doc__, 'doc')
+        self.assertEqual(func.__name__, 'func')
+        self.assertFalse(hasattr(func, '__wrapped__'))
+
+        def tag(f):
+            f.tag = 'tagged'
+            return f
+
+        @overload
+        @tag
+        def tagged(arg):
+            pass
+        self.assertEqual(tagged.tag, 'tagged')
+
+    def test_register_released(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(a, b):
+            return 'a, b'
+
+        dispatch = weakref.ref(func)
+        # released as soon as it's dropped, rather than whenever the garbage collector runs
+        gc.disable()
+        try:
+            del func
+            self.assertIsNone(dispatch())
+        finally:
+            gc.enable()
+
+    def test_reload(self):
+        source = textwrap.dedent('''
+            from overload import overload
+
+            @overload
+            def func(a:int):
+                return {!r}
+
+            @overload
+            def func(a:str):
+                return 'str'
+        ''')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reloaded_overloads.py')
+            with open(path, 'w') as file:
+                file.write(source.format('first'))
+            sys.path.insert(0, directory)
+            try:
+                module = importlib.import_module('reloaded_overloads')
+                first = module.func
+                self.assertEqual(first(1), 'first')
+                with open(path, 'w') as file:
+                    file.write(source.format('reloaded'))
+                importlib.reload(module)
+            finally:
+                sys.path.remove(directory)
+                del sys.modules['reloaded_overloads']
+
+        # the old module's globals still refer to the old multiple-dispatch while it's reloaded
+        self.assertIsNot(module.func, first)
+        self.assertEqual(module.func(1), 'reloaded')
+        self.assertEqual(module.func('1'), 'str')
+        self.assertEqual(first(1), 'first')
+
+    def test_method(self):
+        'check we can overload instance methods'
+        class A:
+            @overload
+            def method(self):
+                return 'ok'
+            @method.add
+            def method(self, *args):
+                return 'args'
+        self.assertEqual(A().method(), 'ok')
+        self.assertEqual(A().method(1), 'args')
+
+    def test_classmethod(self):
+        'check we can overload classmethods'
+        class A:
+            @overload
+            @classmethod
+            def method(cls):
+                return 'ok'
+            @method.add
+            @classmethod
+            def method(cls, *args):
+                return 'args'
+        self.assertEqual(A.method(), 'ok')
+        self.assertEqual(A.method(1), 'args')
+
+    def test_staticmethod(self):
+        'check we can overload staticmethods'
+        class A:
+            @overload
+            @staticmethod
+            def method():
+                return 'ok'
+            @method.add
+            @staticmethod
+            def method(*args):
+                return 'args'
+        self.assertEqual(A.method(), 'ok')
+        self.assertEqual(A.method(1), 'args')
+
+    def test_class(self):
+        @overload
+        class A(object):
+            first = True
+            def __new__(cls):
+                # must explicitly reference the base class
+                return object.__new__(cls)
+
+        @A.add
+        class A(object):
+            first = False
+            def __new__(cls, a):
+                # must explicitly reference the base class
+                return object.__new__(cls)
+        self.assertEqual(A().first, True)
+        self.assertEqual(A(1).first, False)
+
+    def test_class_attributes(self):
+        'check the overloaded class keeps the attributes of the first class'
+        @overload
+        class A(object):
+            LIMIT = 10
+            def __new__(cls):
+                return object.__new__(cls)
+            @staticmethod
+            def helper():
+                return 'helper'
+
+        @A.add
+        class A(object):
+            def __new__(cls, a):
+                return object.__new__(cls)
+        self.assertEqual(A.LIMIT, 10)
+        self.assertEqual(A.helper(), 'helper')
+
+    def test_arg_pattern(self):
+        @overload
+        def func(a):
+            return 'with a'
+
+        @func.add
+        def func(a, b):
+            return 'with a and b'
+
+        self.assertEqual(func('a'), 'with a')
+        self.assertEqual(func('a', 'b'), 'with a and b')
+        self.assertRaises(TypeError, func)
+        self.assertRaises(TypeError, func, 'a', 'b', 'c')
+        self.assertRaises(TypeError, func, b=1)
+
+    def test_positional_only_args(self):
+        @overload
+        def func(a, /, b):
+            return 'with b and positional-only a'
+
+        @func.add
+        def func(a, b):
+            return 'with a and b'
+
+        self.assertEqual(func('a', b='b'), 'with b and positional-only a')
+        self.assertEqual(func(a='a', b='b'), 'with a and b')
+
+    def test_overload_independent(self):
+        class A(object):
+            @overload
+            def method(self):
+                return 'a'
+
+        class B(object):
+            @overload
+            def method(self):
+                return 'b'
+
+        self.assertEqual(A().method(), 'a')
+        self.assertEqual(B().method(), 'b')
+
+    def test_shared_implementation(self):
+        @overload
+        def first(a:str):
+            return 'first str'
+
+        @overload
+        def second(a:str):
+            return 'second str'
+
+        def shared(a:int):
+            return 'int'
+
+        first.add(shared)
+        second.add(shared)
+
+        self.assertEqual(first('1'), 'first str')
+        self.assertEqual(second('1'), 'second str')
+        self.assertEqual(first(1), 'int')
+        self.assertEqual(second(1), 'int')
+
+    def test_arg_types(self):
+        @overload
+        def func(a:int):
+            return 'int'
+
+        @func.add
+        def func(a:str):
+            return 'str'
+
+        @func.add
+        def func(a:Union[dict, list]):
+            return 'dict or list'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1'), 'str')
+        self.assertEqual(func({}), 'dict or list')
+        self.assertRaises(TypeError, func, ())
+
+    def test_add_after_call(self):
+        @overload
+        def func(a:int):
+            return 'int'
+
+        self.assertEqual(func(1), 'int')
+        self.assertRaises(TypeError, func, 1.0)
+
+        @func.add
+        def func(a:float):
+            return 'float'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func(1.0), 'float')
+
+    def test_default_types(self):
+        @overload
+        def func(a:int, b:str='b'):
+            return 'int, str'
+
+        @func.add
+        def func(a:int, b:int=1):
+            return 'int, int'
+
+        self.assertEqual(func(1), 'int, str')
+        self.assertEqual(func(1, 'b'), 'int, str')
+        self.assertEqual(func(1, 2), 'int, int')
+        self.assertEqual(func(1, b=2), 'int, int')
+        self.assertRaises(TypeError, func, 1, 2.0)
+
+    def test_default_shapes(self):
+        @overload
+        def func(a, b, *, c=None):
+            return 'a, b'
+
+        @func.add
+        def func(a=None, *, c):
+            return 'a, c'
+
+        @func.add
+        def func(*args):
+            return 'args'
+
+        self.assertEqual(func(1), 'args')
+        self.assertEqual(func(1, 2), 'a, b')
+        self.assertEqual(func(c=3), 'a, c')
+        self.assertEqual(func(1, c=3), 'a, c')
+        self.assertEqual(func(1, 2, 3), 'args')
+
+    def test_specificity(self):
+        @overload
+        def func(*args):
+            return 'args'
+
+        @func.add
+        def func(a, b):
+            return 'a, b'
+
+        @func.add
+        def func(a:int, b):
+            return 'int, b'
+
+        @func.add
+        def func(a:int, b=None, **kwargs):
+            return 'int, b, kwargs'
+
+        self.assertEqual(func(1, 2), 'int, b')
+        self.assertEqual(func('1', 2), 'a, b')
+        self.assertEqual(func(1), 'int, b, kwargs')
+        self.assertEqual(func('1'), 'args')
+
+    def test_implementation_errors(self):
+        @overload
+        def func(a:int):
+            raise ValueError('bad int')
+
+        @func.add
+        def func(a:object):
+            return 'object'
+
+        self.assertRaisesRegex(ValueError, 'bad int', func, 1)
+        self.assertRaisesRegex(ValueError, 'bad int', func, a=1)
+        self.assertEqual(func('1'), 'object')
+
+    def test_many_argument_types(self):
+        @overload
+        def func(a:int):
+            return 'int'
+
+        @func.add
+        def func(a:object):
+            return 'object'
+
+        first = type('T', (), {})
+        self.assertEqual(func(first()), 'object')
+        self.assertEqual(func(a=first()), 'object')
+        released = weakref.ref(first)
+        del first
+
+        # calls with enough other types push the first out of the caches
+        for n in range(_DISPATCH_CACHE_SIZE):
+            t = type(f'T{n}', (), {})
+            self.assertEqual(func(t()), 'object')
+            self.assertEqual(func(a=t()), 'object')
+        del t
+        gc.collect()
+        self.assertIsNone(released())
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func(a=1), 'int')
+
+    def test_concurrent_first_calls(self):
+        'check threads all calling before the definitions are put in order find the same one'
+        def call_concurrently(func):
+            barrier = threading.Barrier(4)
+            results = []
+
+            def call():
+                barrier.wait()
+                try:
+                    results.append(func(1, b=2))
+                except TypeError as error:
+                    results.append(error)
+
+            threads = [threading.Thread(target=call) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return results
+
+        switch_interval = sys.getswitchinterval()
+        # switch threads as often as possible, so they overlap while the first call prepares
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(20):
+                @overload
+                def func(a:int, b):
+                    return 'int'
+
+                for _ in range(150):
+                    def other(a:str, b):
+                        return 'str'
+                    func.add(other)
+
+                self.assertEqual(call_concurrently(func), ['int'] * 4)
+                self.assertEqual(func(1, b=2), 'int')
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    def test_protocol_types(self):
+        @runtime_checkable
+        class HasX(Protocol):
+            x: int
+
+        class Obj:
+            pass
+
+        @overload
+        def func(a:HasX):
+            return 'hasx'
+
+        @func.add
+        def func(a):
+            return 'any'
+
+        without_x, with_x = Obj(), Obj()
+        with_x.x = 1
+        self.assertEqual(func(without_x), 'any')
+        self.assertEqual(func(with_x), 'hasx')
+        self.assertEqual(func(a=without_x), 'any')
+        self.assertEqual(func(a=with_x), 'hasx')
+
+    def test_virtual_subclass_types(self):
+        class Base(abc.ABC):
+            pass
+
+        class T:
+            pass
+
+        @overload
+        def func(a:Base):
+            return 'base'
+
+        @func.add
+        def func(a):
+            return 'any'
+
+        self.assertEqual(func(T()), 'any')
+        self.assertEqual(func(a=T()), 'any')
+        Base.register(T)
+        self.assertEqual(func(T()), 'base')
+        self.assertEqual(func(a=T()), 'base')
+
+    def test_proxy_types(self):
+        class Proxy:
+            def __init__(self, wrapped):
+                self._wrapped = wrapped
+
+            @property  # type: ignore[misc]
+            def __class__(self):
+                return type(self._wrapped)
+
+        @overload
+        def func(a:int):
+            return 'int'
+
+        @func.add
+        def func(a:str):
+            return 'str'
+
+        self.assertEqual(func(Proxy(1)), 'int')
+        self.assertEqual(func(Proxy('s')), 'str')
+        self.assertEqual(func(a=Proxy(1)), 'int')
+        self.assertEqual(func(a=Proxy('s')), 'str')
+
+    def test_string_arg_types(self):
+        @overload
+        def func(a:'int'):
+            return 'int'
+
+        @func.add
+        def func(a:'Union[str, bytes]', b:int=0):
+            return 'str or bytes'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1'), 'str or bytes')
+        self.assertEqual(func(b'1', 1), 'str or bytes')
+        self.assertRaises(TypeError, func, 1.0)
+
+    def test_forward_reference_types(self):
+        global _Later
+
+        @overload
+        def func(a:'_Later'):  # type: ignore[name-defined]
+            return 'later'
+
+        @func.add
+        def func(a:int):
+            return 'int'
+
+        class _Later:
+            pass
+
+        try:
+            self.assertEqual(func(_Later()), 'later')
+            self.assertEqual(func(1), 'int')
+        finally:
+            del _Later
+
+    def test_unchecked_annotations(self):
+        'check annotations that are never checked needn\'t resolve'
+        @overload
+        def func(a=None) -> 'Missing':  # type: ignore[name-defined]
+            return 'a'
+
+        @func.add
+        def func(a:int, b:str=None) -> 'Missing':  # type: ignore[name-defined]
+            return 'int, b'
+
+        self.assertEqual(func(), 'a')
+        self.assertEqual(func(1), 'int, b')
+        self.assertEqual(func(1, 's'), 'int, b')
+
+        class A:
+            @overload
+            @classmethod
+            def method(cls:'Missing', a:int):  # type: ignore[name-defined]
+                return 'int'
+
+            @method.add
+            @classmethod
+            def method(cls:'Missing', a:'str'):  # type: ignore[name-defined]
+                return 'str'
+
+        self.assertEqual(A.method(1), 'int')
+        self.assertEqual(A.method('s'), 'str')
+
+    def test_varargs(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(*args):
+            return '*args {}'.format(len(args))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(1, 2), '*args 2')
+
+    def test_varargs_types(self):
+        @overload
+        def func(*args: int):
+            return 'int'
+
+        @func.add
+        def func(*args: str):
+            return 'str'
+
+        @func.add
+        def func(*args):
+            return 'any'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1', '2'), 'str')
+        self.assertEqual(func(1, '2'), 'any')
+
+    def test_varargs_types_with_locals(self):
+        @overload
+        def func(*args: int):
+            result = 'int'
+            return result
+
+        @func.add
+        def func(*args):
+            return 'any'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1'), 'any')
+
+    def test_varargs_mixed(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(a, *args):
+            return '*args {}'.format(len(args))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(1, 2), '*args 1')
+        self.assertEqual(func(1, 2, 3), '*args 2')
+
+    def test_varargs_types_mixed(self):
+        @overload
+        def func(a: str, *args: int):
+            return 'str, *int'
+
+        @func.add
+        def func(*args):
+            return 'any'
+
+        self.assertEqual(func('1'), 'str, *int')
+        self.assertEqual(func('1', 2, 3), 'str, *int')
+        self.assertEqual(func('1', '2'), 'any')
+
+    def test_kw_types_mixed(self):
+        @overload
+        def func(a: str, **kw: int):
+            return 'str, **int'
+
+        @func.add
+        def func(**kw):
+            return 'any'
+
+        self.assertEqual(func(a='1', b=2), 'str, **int')
+        self.assertEqual(func(a='1', b='2'), 'any')
+
+    def test_kw(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(**kw):
+            return '**kw {}'.format(len(kw))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=1, b=2), '**kw 2')
+
+    def test_kw_only_args(self):
+        @overload
+        def func(a, *, b):
+            return 'with a and keyword only b'
+
+        @func.add
+        def func(a, b):
+            return 'with a and b'
+
+        self.assertEqual(func(1, 2), 'with a and b')
+        self.assertEqual(func(a=1, b=2), 'with a and keyword only b')
+
+    def test_kw_types(self):
+        @overload
+        def func(**kw: int):
+            return 'int'
+
+        @func.add
+        def func(**kw: str):
+            return 'str'
+
+        @func.add
+        def func(**kw):
+            return 'any'
+
+        self.assertEqual(func(a=1), 'int')
+        self.assertEqual(func(b='1', a='2'), 'str')
+        self.assertEqual(func(b=1, a='2'), 'any')
+
+    def test_kw_mixed(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(a, **kw):
+            return '**kw {}'.format(len(kw))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=1, b=2), '**kw 1')
+
+    def test_kw_mixed2(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(c=1, **kw):
+            return '**kw {}'.format(len(kw))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(c=1, a=2), '**kw 1')
+
+    def test_kw_mixed3(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @func.add
+        def func(a=1, b=2, c=3, **kw):
+            return 'a {a}, b {b}, c {c}, **kw {count}'.format(a=a, b=b, c=c, count=len(kw))
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=4, c=5, d=0), 'a 4, b 2, c 5, **kw 1')
+
+
+class TestOverloadMyPyIntegration(unittest.TestCase):
+    def test_wrapping(self):
+        'check that we generate a nicely-wrapped result'
+        @overload
+        def func(arg):
+            'doc'
+            pass
+        @overload
+        def func(*args):
+            'doc2'
+            pass
+        self.assertEqual(func.__doc__, 'doc')
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc3'
+        self.assertEqual(func.__doc__, 'doc3')
+
+    def test_method(self):
+        'check we can overload instance methods'
+        class A:
+            @overload
+            def method(self):
+                return 'ok'
+            @overload
+            def method(self, *args):
+                return 'args'
+            @wrap_overloaded_as
+            def method(self, *args, **kwargs):
+                'doc'
+        self.assertEqual(A().method(), 'ok')
+        self.assertEqual(A().method(1), 'args')
+
+    def test_classmethod(self):
+        'check we can overload classmethods'
+        class A:
+            @overload
+            @classmethod
+            def method(cls):
+                return 'ok'
+            @overload
+            @classmethod
+            def method(cls, *args):
+                return 'args'
+            @wrap_overloaded_as
+            @classmethod
+            def method(cls, *args, **kwargs):
+                'doc'
+        self.assertEqual(A.method(), 'ok')
+        self.assertEqual(A.method(1), 'args')
+
+    def test_staticmethod(self):
+        'check we can overload staticmethods'
+        class A:
+            @overload
+            @staticmethod
+            def method():
+                return 'ok'
+            @method.add
+            @staticmethod
+            def method(*args):
+                return 'args'
+            @wrap_overloaded_as
+            @staticmethod
+            def method(cls, *args, **kwargs):
+                'doc'
+        self.assertEqual(A.method(), 'ok')
+        self.assertEqual(A.method(1), 'args')
+
+    def test_class(self):
+        @overload
+        class A(object):
+            first = True
+            def __new__(cls):
+                # must explicitly reference the base class
+                return object.__new__(cls)
+
+        @overload
+        class A(object):
+            first = False
+            def __new__(cls, a):
+                # must explicitly reference the base class
+                return object.__new__(cls)
+
+        @wrap_overloaded_as
+        class A(object):
+            'doc'
+            def __new__(cls):
+                pass
+
+        self.assertEqual(A().first, True)
+        self.assertEqual(A(1).first, False)
+
+    def test_arg_pattern(self):
+        @overload
+        def func(a):
+            return 'with a'
+
+        @overload
+        def func(a, b):
+            return 'with a and b'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func('a'), 'with a')
+        self.assertEqual(func('a', 'b'), 'with a and b')
+        self.assertRaises(TypeError, func)
+        self.assertRaises(TypeError, func, 'a', 'b', 'c')
+        self.assertRaises(TypeError, func, b=1)
+
+    def test_positional_only_args(self):
+        @overload
+        def func(a, /, b):
+            return 'with b and positional-only a'
+
+        @overload
+        def func(a, b):
+            return 'with a and b'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func('a', b='b'), 'with b and positional-only a')
+        self.assertEqual(func(a='a', b='b'), 'with a and b')
+
+    def test_overload_independent(self):
+        class A(object):
+            @overload
+            def method(self):
+                return 'a'
+            @overload
+            def method(self, a):
+                return 'a2'
+            @wrap_overloaded_as
+            def method(self, *args, **kwargs):
+                'doc A'
+
+        class B(object):
+            @overload
+            def method(self):
+                return 'b'
+            @overload
+            def method(self, b):
+                return 'b2'
+            @wrap_overloaded_as
+            def method(self, *args, **kwargs):
+                'doc B'
+
+        self.assertEqual(A().method(), 'a')
+        self.assertEqual(B().method(), 'b')
+
+    def test_arg_types(self):
+        @overload
+        def func(a:int):
+            return 'int'
+
+        @overload
+        def func(a:str):
+            return 'str'
+
+        @overload
+        def func(a:Union[dict, list]):
+            return 'dict or list'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1'), 'str')
+        self.assertEqual(func({}), 'dict or list')
+        self.assertRaises(TypeError, func, ())
+
+    def test_varargs(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(*args):
+            return '*args {}'.format(len(args))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(1, 2), '*args 2')
+
+    def test_varargs_types(self):
+        @overload
+        def func(*args: int):
+            return 'int'
+
+        @overload
+        def func(*args: str):
+            return 'str'
+
+        @overload
+        def func(*args):
+            return 'any'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'int')
+        self.assertEqual(func('1', '2'), 'str')
+        self.assertEqual(func(1, '2'), 'any')
+
+    def test_varargs_mixed(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(a, *args):
+            return '*args {}'.format(len(args))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(1, 2), '*args 1')
+        self.assertEqual(func(1, 2, 3), '*args 2')
+
+    def test_kw(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(**kw):
+            return '**kw {}'.format(len(kw))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=1, b=2), '**kw 2')
+
+    def test_kw_only_args(self):
+        @overload
+        def func(a, *, b):
+            return 'with a and keyword only b'
+
+        @overload
+        def func(a, b):
+            return 'with a and b'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1, 2), 'with a and b')
+        self.assertEqual(func(a=1, b=2), 'with a and keyword only b')
+
+    def test_kw_types(self):
+        @overload
+        def func(**kw: int):
+            return 'int'
+
+        @overload
+        def func(**kw: str):
+            return 'str'
+
+        @overload
+        def func(**kw):
+            return 'any'
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(a=1), 'int')
+        self.assertEqual(func(b='1', a='2'), 'str')
+        self.assertEqual(func(b=1, a='2'), 'any')
+
+    def test_kw_mixed(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(a, **kw):
+            return '**kw {}'.format(len(kw))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=1, b=2), '**kw 1')
+
+    def test_kw_mixed2(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(c=1, **kw):
+            return '**kw {}'.format(len(kw))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(c=1, a=2), '**kw 1')
+
+    def test_kw_mixed3(self):
+        @overload
+        def func(a):
+            return 'a'
+
+        @overload
+        def func(a=1, b=2, c=3, **kw):
+            return 'a {a}, b {b}, c {c}, **kw {count}'.format(a=a, b=b, c=c, count=len(kw))
+
+        @wrap_overloaded_as
+        def func(*args, **kwargs):
+            'doc'
+
+        self.assertEqual(func(1), 'a')
+        self.assertEqual(func(a=1), 'a')
+        self.assertEqual(func(a=4, c=5, d=0), 'a 4, b 2, c 5, **kw 1')
+
+
+
+if __name__ == '__main__':
+    unittest.main()